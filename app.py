@@ -1,23 +1,62 @@
 import gradio as gr
-import PyPDF2
+import fitz
 import os
+import asyncio
+import atexit
 import json
-import time
+import html
+import hashlib
+import pickle
+import re
+import threading
 import google.generativeai as genai
 import logging
-from google.api_core import retry
+import faiss
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from google.api_core import exceptions as gexc
+from google.api_core import retry_async
+from sentence_transformers import SentenceTransformer
+
+# orjson is a much faster C parser; fall back to the standard library when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # --- Setup Logging ---
 logging.basicConfig(level=logging.ERROR)
+# App-level notices such as CV truncation go through this logger so they show despite the ERROR root level
+logger = logging.getLogger("aurora")
+logger.setLevel(logging.WARNING)
 
 # --- Configure Google AI Studio API ---
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    raise ValueError("Google API key not found. Set the GOOGLE_API_KEY environment variable.")
-genai.configure(api_key=GOOGLE_API_KEY)
-model = genai.GenerativeModel('gemini-pro-latest')
+# The model is built on first use, so the key is read after Spaces secrets are populated
+# and tabs that never call Gemini don't pay for client setup.
+model = None
+
+def get_model():
+    global model
+    if model is None:
+        google_api_key = os.getenv("GOOGLE_API_KEY")
+        if not google_api_key:
+            raise ValueError("Google API key not found. Set the GOOGLE_API_KEY environment variable.")
+        genai.configure(api_key=google_api_key)
+        model = genai.GenerativeModel('gemini-pro-latest')
+    return model
 
 # --- Utility Functions ---
+# CVs rarely need more than this; trailing pages are mostly boilerplate that only adds prompt tokens
+MAX_CV_CHARS = 8000
+
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Shared across requests so PDF extraction never pays per-request thread start-up
+PDF_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="aurora-pdf")
+
 def validate_input(text, field_name, max_length=500):
     if not text or text.strip() == "":
         raise ValueError(f"{field_name} cannot be empty.")
@@ -26,191 +65,418 @@ def validate_input(text, field_name, max_length=500):
     return text.strip()
 
 def safe_parse_json(response_text):
+    # Takes the outermost {...}, so code fences, stray whitespace or surrounding prose don't break parsing
+    match = JSON_OBJECT_RE.search(response_text)
+    if not match:
+        logging.error("JSON parsing error: no JSON object found in response")
+        return {}
     try:
-        cleaned_text = response_text.strip()
-        if cleaned_text.startswith('```json') and cleaned_text.endswith('```'):
-            cleaned_text = cleaned_text[7:-3].strip()
-        return json.loads(cleaned_text)
+        return json_loads(match.group(0))
     except json.JSONDecodeError as e:
         logging.error(f"JSON parsing error: {e}")
         return {}
 
-@retry.Retry(predicate=retry.if_exception_type(Exception), initial=1.0, maximum=60.0, multiplier=2.0)
-def call_gemini_api(prompt):
-    return model.generate_content(prompt)
+def normalize_skills(skills):
+    # Maps case-folded, stripped names to their display form so case/whitespace variants compare equal
+    return {skill.casefold().strip(): skill.strip() for skill in skills if isinstance(skill, str) and skill.strip()}
+
+def create_skill_tags(sorted_skills):
+    # Expects an already sorted list. Skill names come from the LLM, so escape them before rendering as HTML
+    return "".join(f"<span class='skill-tag'>{html.escape(skill)}</span>" for skill in sorted_skills)
+
+def extract_cv_text(cv_bytes):
+    # A PyMuPDF document must not be shared between threads, so its pages are read in one worker
+    with fitz.open(stream=cv_bytes, filetype="pdf") as doc:
+        return "".join(page.get_text("text") for page in doc)
+
+# --- Prompt Cache ---
+EXACT_CACHE_PATH = "aurora_exact_cache.pkl"
+EXACT_CACHE_MAX_ENTRIES = 512
+SEMANTIC_CACHE_MODEL = 'all-MiniLM-L6-v2'
+SEMANTIC_CACHE_THRESHOLD = 0.87
+SEMANTIC_CACHE_MAX_ENTRIES = 1000
+SEMANTIC_CACHE_INDEX_PATH = "aurora_cache.faiss"
+SEMANTIC_CACHE_DATA_PATH = "aurora_cache.pkl"
+
+class SemanticCache:
+    # Vectors are L2-normalized, so inner product on an IndexFlatIP equals cosine similarity.
+    # Entries are [namespace, response_text, last_used] and share positions with the index.
+    def __init__(self, index_path, data_path, threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=SEMANTIC_CACHE_MAX_ENTRIES):
+        self.index_path = index_path
+        self.data_path = data_path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._encoder = None
+        self._lock = threading.Lock()
+        self._index = None
+        self._entries = []
+        self._clock = 0
+        self._dirty = False
+        self._load()
+
+    def _embed(self, text):
+        # Double-checked under the lock so concurrent first requests load the model only once
+        if self._encoder is None:
+            with self._lock:
+                if self._encoder is None:
+                    self._encoder = SentenceTransformer(SEMANTIC_CACHE_MODEL)
+        return self._encoder.encode([text], normalize_embeddings=True).astype(np.float32)
+
+    def _load(self):
+        if not (os.path.exists(self.index_path) and os.path.exists(self.data_path)):
+            return
+        try:
+            index = faiss.read_index(self.index_path)
+            with open(self.data_path, 'rb') as f:
+                entries = pickle.load(f)
+        except Exception as e:
+            logging.error(f"Could not load semantic cache: {e}")
+            return
+        if index.ntotal != len(entries):
+            logging.error("Semantic cache index and data are out of sync; starting empty.")
+            return
+        self._index = index
+        self._entries = entries
+        self._clock = max((entry[2] for entry in entries), default=0)
+
+    def _write(self):
+        # Caller holds self._lock. Write to temp files and swap them in, so a kill mid-write
+        # never leaves a truncated cache behind.
+        try:
+            faiss.write_index(self._index, self.index_path + ".tmp")
+            with open(self.data_path + ".tmp", 'wb') as f:
+                pickle.dump(self._entries, f)
+            os.replace(self.index_path + ".tmp", self.index_path)
+            os.replace(self.data_path + ".tmp", self.data_path)
+            self._dirty = False
+        except Exception as e:
+            logging.error(f"Could not save semantic cache: {e}")
+
+    def save(self):
+        with self._lock:
+            if self._dirty and self._index is not None:
+                self._write()
+
+    def lookup(self, namespace, text):
+        # Returns (response_text or None, vector); on a miss the vector is handed back to add()
+        vector = self._embed(text)
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return None, vector
+            # Search a few neighbours so entries from other namespaces can be skipped
+            scores, ids = self._index.search(vector, min(8, self._index.ntotal))
+            for score, idx in zip(scores[0], ids[0]):
+                if score < self.threshold:
+                    break
+                entry = self._entries[idx]
+                if entry[0] == namespace:
+                    self._clock += 1
+                    entry[2] = self._clock
+                    self._dirty = True
+                    return entry[1], vector
+        return None, vector
+
+    def add(self, namespace, vector, response_text):
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexFlatIP(vector.shape[1])
+            if len(self._entries) >= self.max_entries:
+                # Evict the least recently used entry; remove_ids shifts later ids down like del does
+                oldest = min(range(len(self._entries)), key=lambda i: self._entries[i][2])
+                self._index.remove_ids(np.array([oldest], dtype=np.int64))
+                del self._entries[oldest]
+            self._clock += 1
+            self._index.add(vector)
+            self._entries.append([namespace, response_text, self._clock])
+            # Write through on insert: SIGTERM on a container restart skips atexit hooks.
+            # atexit still flushes recency updates made by lookup().
+            self._write()
+
+semantic_cache = SemanticCache(SEMANTIC_CACHE_INDEX_PATH, SEMANTIC_CACHE_DATA_PATH)
+
+class ExactCache:
+    # Exact-match layer checked before the semantic cache: an LRU map of sha256(prompt)[:16] -> response text.
+    # Keys address the full prompt, so editing a prompt template never serves stale responses.
+    def __init__(self, path, max_entries=EXACT_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                self._entries = pickle.load(f)
+        except Exception as e:
+            logging.error(f"Could not load exact cache: {e}")
+
+    def _write(self):
+        # Caller holds self._lock; rewriting the whole bounded map keeps the file from growing
+        try:
+            with open(self.path + ".tmp", 'wb') as f:
+                pickle.dump(self._entries, f)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            logging.error(f"Could not save exact cache: {e}")
+
+    def save(self):
+        with self._lock:
+            self._write()
+
+    def get(self, digest):
+        with self._lock:
+            cached_text = self._entries.get(digest)
+            if cached_text is not None:
+                self._entries.move_to_end(digest)
+            return cached_text
+
+    def put(self, digest, response_text):
+        with self._lock:
+            self._entries[digest] = response_text
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._write()
+
+exact_cache = ExactCache(EXACT_CACHE_PATH)
+
+def prompt_digest(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+
+def flush_caches():
+    semantic_cache.save()
+    exact_cache.save()
+
+atexit.register(flush_caches)
+
+async def lookup_cached_text(digest, semantic_key):
+    # Returns (cached_text or None, vector). The vector is the semantic embedding computed on a miss,
+    # so storing the response doesn't run the encoder a second time.
+    # Empty text is treated as a miss, so a bad reply can never stick.
+    cached_text = exact_cache.get(digest)
+    vector = None
+    if not cached_text and semantic_key:
+        cached_text, vector = await asyncio.to_thread(semantic_cache.lookup, *semantic_key)
+        if cached_text:
+            await asyncio.to_thread(exact_cache.put, digest, cached_text)
+    return cached_text or None, vector
+
+async def store_cached_text(digest, semantic_key, vector, response_text):
+    if not response_text.strip():
+        return
+    await asyncio.to_thread(exact_cache.put, digest, response_text)
+    if semantic_key and vector is not None:
+        await asyncio.to_thread(semantic_cache.add, semantic_key[0], vector, response_text)
+
+TRANSIENT_API_ERRORS = (gexc.ServiceUnavailable, gexc.DeadlineExceeded, gexc.InternalServerError, gexc.Aborted)
+# Longest a single click waits on Gemini, across every retry of both layers below
+GEMINI_REQUEST_TIMEOUT = 120.0
+
+# Only the initial request is retried; a stream that fails midway surfaces the error to the caller
+# Programming errors and permission failures are not retried, so they surface immediately.
+# Quota exhaustion gets its own, slower backoff. The outer decorator re-enters the inner one on every
+# transient retry, so neither layer's timeout is the real bound; generate_content enforces one deadline.
+@retry_async.AsyncRetry(predicate=retry_async.if_exception_type(*TRANSIENT_API_ERRORS), initial=1.0, maximum=60.0, multiplier=2.0, timeout=GEMINI_REQUEST_TIMEOUT)
+@retry_async.AsyncRetry(predicate=retry_async.if_exception_type(gexc.ResourceExhausted), initial=5.0, maximum=120.0, multiplier=2.0, timeout=GEMINI_REQUEST_TIMEOUT)
+async def generate_content_with_retry(prompt, stream=False):
+    return await get_model().generate_content_async(prompt, stream=stream)
+
+async def generate_content(prompt, stream=False):
+    try:
+        return await asyncio.wait_for(generate_content_with_retry(prompt, stream=stream), timeout=GEMINI_REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Gemini did not respond within {GEMINI_REQUEST_TIMEOUT:.0f} seconds. Please try again.")
+
+async def call_gemini_api(prompt, semantic_key=None, cache_if=None):
+    # semantic_key is a (namespace, text) pair naming the user input the prompt was built from.
+    # Prompts without one (e.g. those embedding CV text) are never served from the semantic cache.
+    # cache_if, when given, must return a truthy value for the response text to be cached.
+    digest = prompt_digest(prompt)
+    cached_text, vector = await lookup_cached_text(digest, semantic_key)
+    if cached_text is not None:
+        return SimpleNamespace(text=cached_text)
+    response = await generate_content(prompt)
+    if cache_if is None or cache_if(response.text):
+        await store_cached_text(digest, semantic_key, vector, response.text)
+    return response
+
+async def stream_gemini_api(prompt, semantic_key=None):
+    # Yields the response text chunk by chunk; a cached response arrives as a single chunk
+    digest = prompt_digest(prompt)
+    cached_text, vector = await lookup_cached_text(digest, semantic_key)
+    if cached_text is not None:
+        yield cached_text
+        return
+    response = await generate_content(prompt, stream=True)
+    chunks = []
+    async for chunk in response:
+        chunks.append(chunk.text)
+        yield chunk.text
+    await store_cached_text(digest, semantic_key, vector, "".join(chunks))
+
+# --- Prompt Templates ---
+# Built once at import; each request only fills in the user input with str.format
+SKILLS_PROMPT_TMPL = """
+Analyze the following job description and identify the required technical and soft skills.
+Then analyze the CV text and identify which of those required skills are present in it.
+Return a JSON object with four lists: `required_technical_skills`, `required_soft_skills`,
+`matched_technical_skills` and `matched_soft_skills`.
+Job Description: {job_description}
+CV Text: {cv_text}
+"""
 
-# --- Worker Functions ---
-def analyze_cv(cv_file, job_description, progress=gr.Progress(track_tqdm=True)):
-    # Initialize a default output dictionary for all components
-    default_output = {
-        'report_header': gr.update(visible=False),
-        'matched_tech_header': gr.update(visible=False),
-        'matched_tech_output': gr.update(visible=False),
-        'matched_soft_header': gr.update(visible=False),
-        'matched_soft_output': gr.update(visible=False),
-        'missing_tech_header': gr.update(visible=False),
-        'missing_tech_output': gr.update(visible=False),
-        'missing_soft_header': gr.update(visible=False),
-        'missing_soft_output': gr.update(visible=False),
-        'recommendation_output': gr.update(visible=False),
-        'tabs': gr.update(selected=1)
-    }
+LEARNING_PATH_PROMPT_TMPL = """
+For the following missing skills: {skills}, suggest specific online courses or resources
+from platforms like Coursera, freeCodeCamp, or Google Skillshop. Respond in Markdown with one bullet per
+recommendation in the form `- **skill**: course name on platform`, without any introduction or closing text.
+"""
+
+INTERVIEW_PROMPT_TMPL = """
+Based on the following job description, generate 3 relevant interview questions for the role.
+Respond in Markdown as a numbered list of the questions only, without any introduction or closing text.
+Job Description: {job_description}
+"""
 
+# Semantic cache namespaces carry a digest of their template, so editing a template retires its old entries
+LEARNING_PATH_CACHE_NAMESPACE = "learning_path:" + prompt_digest(LEARNING_PATH_PROMPT_TMPL)
+INTERVIEW_CACHE_NAMESPACE = "interview_questions:" + prompt_digest(INTERVIEW_PROMPT_TMPL)
+
+# --- Worker Functions ---
+# Shared by every analyze_cv yield. Neither carries a value, so Gradio's postprocessing leaves them intact.
+HIDDEN_UPDATE = gr.update(visible=False)
+TABS_TO_REPORT = gr.update(selected=1)
+
+def pack_report_updates(report_header=HIDDEN_UPDATE, matched_tech_header=HIDDEN_UPDATE, matched_tech_output=HIDDEN_UPDATE,
+                        matched_soft_header=HIDDEN_UPDATE, matched_soft_output=HIDDEN_UPDATE, missing_tech_header=HIDDEN_UPDATE,
+                        missing_tech_output=HIDDEN_UPDATE, missing_soft_header=HIDDEN_UPDATE, missing_soft_output=HIDDEN_UPDATE,
+                        recommendation_output=HIDDEN_UPDATE):
+    # Order matches the outputs of analyze_button.click
+    return [
+        report_header, matched_tech_header, matched_tech_output,
+        matched_soft_header, matched_soft_output, missing_tech_header,
+        missing_tech_output, missing_soft_header, missing_soft_output,
+        recommendation_output, TABS_TO_REPORT
+    ]
+
+async def analyze_cv(cv_bytes, job_description, progress=gr.Progress(track_tqdm=True)):
     progress(0, desc="Starting analysis...")
 
-    # Validate CV file
-    if not cv_file or not cv_file.name.endswith('.pdf'):
-        default_output['report_header'] = gr.update(visible=True, value="## Error\n---\nPlease upload a valid PDF file.")
-        yield list(default_output.values())
+    # Validate CV file by its PDF magic bytes rather than its name
+    if not cv_bytes or cv_bytes[:4] != b'%PDF':
+        yield pack_report_updates(report_header=gr.update(visible=True, value="## Error\n---\nPlease upload a valid PDF file."))
         return
 
     # Validate job description
     try:
         job_description = validate_input(job_description, "Job Description")
     except ValueError as e:
-        default_output['report_header'] = gr.update(visible=True, value=f"## Error\n---\n{e}")
-        yield list(default_output.values())
+        yield pack_report_updates(report_header=gr.update(visible=True, value=f"## Error\n---\n{e}"))
         return
 
     # Show loading state
-    loading_updates = {
-        'report_header': gr.update(visible=True, value="### Aurora is thinking... Analyzing your profile."),
-        'matched_tech_header': gr.update(visible=False),
-        'matched_tech_output': gr.update(visible=False),
-        'matched_soft_header': gr.update(visible=False),
-        'matched_soft_output': gr.update(visible=False),
-        'missing_tech_header': gr.update(visible=False),
-        'missing_tech_output': gr.update(visible=False),
-        'missing_soft_header': gr.update(visible=False),
-        'missing_soft_output': gr.update(visible=False),
-        'recommendation_output': gr.update(visible=False),
-        'tabs': gr.update(selected=1)
-    }
-    yield list(loading_updates.values())
+    yield pack_report_updates(report_header=gr.update(visible=True, value="### Aurora is thinking... Analyzing your profile."))
 
     try:
         progress(0.2, desc="Extracting text from CV...")
-        pdf_reader = PyPDF2.PdfReader(cv_file.name)
-        cv_text = "".join(page.extract_text() for page in pdf_reader.pages if page.extract_text())
-
-        progress(0.4, desc="Identifying required skills...")
-        job_prompt = f"""
-        Analyze the following job description and identify the required technical and soft skills.
-        Return a JSON object with two lists: `required_technical_skills` and `required_soft_skills`.
-        Job Description: {job_description}
-        """
-        job_response = call_gemini_api(job_prompt)
-        job_result = safe_parse_json(job_response.text)
-        required_tech = job_result.get('required_technical_skills', [])
-        required_soft = job_result.get('required_soft_skills', [])
-
-        progress(0.6, desc="Matching skills in CV...")
-        cv_prompt = f"""
-        Analyze the following CV text and identify which of these technical skills ({', '.join(required_tech)})
-        and soft skills ({', '.join(required_soft)}) are present. Return a JSON object with two lists:
-        `matched_technical_skills` and `matched_soft_skills`.
-        CV Text: {cv_text}
-        """
-        cv_response = call_gemini_api(cv_prompt)
-        cv_result = safe_parse_json(cv_response.text)
-        matched_tech_skills = cv_result.get('matched_technical_skills', [])
-        matched_soft_skills = cv_result.get('matched_soft_skills', [])
+        cv_text = await asyncio.get_running_loop().run_in_executor(PDF_EXECUTOR, extract_cv_text, cv_bytes)
+        if len(cv_text) > MAX_CV_CHARS:
+            logger.warning(f"CV text truncated from {len(cv_text)} to {MAX_CV_CHARS} characters.")
+            cv_text = cv_text[:MAX_CV_CHARS]
+
+        progress(0.4, desc="Matching your CV against the job description...")
+        # One request returns both the required skills and the ones found in the CV
+        skills_prompt = SKILLS_PROMPT_TMPL.format(job_description=job_description, cv_text=cv_text)
+        # Replies that don't parse to a JSON object aren't cached, so the next click retries Gemini
+        skills_response = await call_gemini_api(skills_prompt, cache_if=safe_parse_json)
+        skills_result = safe_parse_json(skills_response.text)
+        required_tech = normalize_skills(skills_result.get('required_technical_skills', []))
+        required_soft = normalize_skills(skills_result.get('required_soft_skills', []))
+        matched_tech_lc = normalize_skills(skills_result.get('matched_technical_skills', []))
+        matched_soft_lc = normalize_skills(skills_result.get('matched_soft_skills', []))
 
         progress(0.8, desc="Calculating match score...")
-        missing_tech_skills = [skill for skill in required_tech if skill not in matched_tech_skills]
-        missing_soft_skills = [skill for skill in required_soft if skill not in matched_soft_skills]
+        # Only required skills count as matches, so stray skills returned by the LLM can't inflate the score.
+        # Each list is sorted once here and shared by the skill tags and the recommendation text.
+        matched_tech_skills = sorted(skill for key, skill in required_tech.items() if key in matched_tech_lc)
+        matched_soft_skills = sorted(skill for key, skill in required_soft.items() if key in matched_soft_lc)
+        missing_tech_skills = sorted(skill for key, skill in required_tech.items() if key not in matched_tech_lc)
+        missing_soft_skills = sorted(skill for key, skill in required_soft.items() if key not in matched_soft_lc)
 
         total_required = len(required_tech) + len(required_soft)
         total_matched = len(matched_tech_skills) + len(matched_soft_skills)
         match_score = (total_matched / total_required) * 100 if total_required > 0 else 0
 
-        def create_skill_tags(skill_list):
-            return "".join([f"<span class='skill-tag'>{skill}</span>" for skill in sorted(skill_list)])
-
         matched_tech_html = create_skill_tags(matched_tech_skills) if matched_tech_skills else "<p>No technical skills found</p>"
         matched_soft_html = create_skill_tags(matched_soft_skills) if matched_soft_skills else "<p>No soft skills found</p>"
 
-        recommendation_text = ""
         if missing_tech_skills or missing_soft_skills:
-            recommendation_text += "### Your Recommended Learning Path\n"
+            recommendation_parts = ["### Your Recommended Learning Path"]
             if missing_tech_skills:
-                recommendation_text += f"- Focus on these technical skills: **{', '.join(sorted(missing_tech_skills))}**.\n"
+                recommendation_parts.append(f"- Focus on these technical skills: **{', '.join(missing_tech_skills)}**.")
             if missing_soft_skills:
-                recommendation_text += f"- Focus on these soft skills: **{', '.join(sorted(missing_soft_skills))}**.\n"
-            recommendation_text += "- We suggest exploring platforms like **Coursera, freeCodeCamp, and Google Skillshop** to master these areas."
+                recommendation_parts.append(f"- Focus on these soft skills: **{', '.join(missing_soft_skills)}**.")
+            recommendation_parts.append("- We suggest exploring platforms like **Coursera, freeCodeCamp, and Google Skillshop** to master these areas.")
+            recommendation_text = "\n".join(recommendation_parts)
         else:
             recommendation_text = "\n\n**Congratulations! You are a strong candidate for this role!**"
 
         progress(1.0, desc="Analysis complete!")
-        final_report = {
-            'report_header': gr.update(visible=True, value=f"## Aurora Analysis Report\n---\n**Overall Match Score:** {match_score:.2f}%"),
-            'matched_tech_header': gr.update(visible=True),
-            'matched_tech_output': gr.update(visible=True, value=matched_tech_html),
-            'matched_soft_header': gr.update(visible=True),
-            'matched_soft_output': gr.update(visible=True, value=matched_soft_html),
-            'missing_tech_header': gr.update(visible=True if missing_tech_skills else False, value="### Missing Technical Skills"),
-            'missing_tech_output': gr.update(visible=True if missing_tech_skills else False, value=create_skill_tags(missing_tech_skills) if missing_tech_skills else "<p>No missing technical skills</p>"),
-            'missing_soft_header': gr.update(visible=True if missing_soft_skills else False, value="### Missing Soft Skills"),
-            'missing_soft_output': gr.update(visible=True if missing_soft_skills else False, value=create_skill_tags(missing_soft_skills) if missing_soft_skills else "<p>No missing soft skills</p>"),
-            'recommendation_output': gr.update(visible=True, value=recommendation_text),
-            'tabs': gr.update(selected=1)
-        }
-        yield list(final_report.values())
+        yield pack_report_updates(
+            report_header=gr.update(visible=True, value=f"## Aurora Analysis Report\n---\n**Overall Match Score:** {match_score:.2f}%"),
+            matched_tech_header=gr.update(visible=True),
+            matched_tech_output=gr.update(visible=True, value=matched_tech_html),
+            matched_soft_header=gr.update(visible=True),
+            matched_soft_output=gr.update(visible=True, value=matched_soft_html),
+            missing_tech_header=gr.update(visible=True if missing_tech_skills else False, value="### Missing Technical Skills"),
+            missing_tech_output=gr.update(visible=True if missing_tech_skills else False, value=create_skill_tags(missing_tech_skills) if missing_tech_skills else "<p>No missing technical skills</p>"),
+            missing_soft_header=gr.update(visible=True if missing_soft_skills else False, value="### Missing Soft Skills"),
+            missing_soft_output=gr.update(visible=True if missing_soft_skills else False, value=create_skill_tags(missing_soft_skills) if missing_soft_skills else "<p>No missing soft skills</p>"),
+            recommendation_output=gr.update(visible=True, value=recommendation_text)
+        )
 
     except Exception as e:
         logging.error(f"Error in analyze_cv: {e}")
-        default_output['report_header'] = gr.update(visible=True, value=f"## An Error Occurred\n---\n {e}")
-        yield list(default_output.values())
+        yield pack_report_updates(report_header=gr.update(visible=True, value=f"## An Error Occurred\n---\n {e}"))
 
-def generate_learning_path(missing_skills, progress=gr.Progress(track_tqdm=True)):
+async def generate_learning_path(missing_skills, progress=gr.Progress(track_tqdm=True)):
     progress(0, desc="Starting learning path generation...")
     try:
         missing_skills = validate_input(missing_skills, "Missing Skills")
         yield gr.update(visible=True, value="### Generating Learning Path...")
-        time.sleep(1)  # Simulate processing
-        skills_list = [s.strip() for s in missing_skills.split(',')]
+        skills_list = [s.strip() for s in missing_skills.split(',') if s.strip()]
         progress(0.5, desc="Querying recommendations...")
-        prompt = f"""
-        For the following missing skills: {', '.join(skills_list)}, suggest specific online courses or resources
-        from platforms like Coursera, freeCodeCamp, or Google Skillshop. Return a JSON object with a list of
-        recommendations, each containing `skill`, `platform`, and `course_name`.
-        """
-        response = call_gemini_api(prompt)
-        result = safe_parse_json(response.text)
-        recommendations = result.get('recommendations', [])
-
-        output = "### Personalized Learning Path\n"
-        for rec in recommendations:
-            output += f"- **{rec['skill']}**: {rec['course_name']} on {rec['platform']}\n"
+        # All skills go into one request as a JSON list; never issue one Gemini call per skill
+        prompt = LEARNING_PATH_PROMPT_TMPL.format(skills=json.dumps(skills_list, ensure_ascii=False))
+        header = "### Personalized Learning Path\n"
+        output = header
+        async for chunk in stream_gemini_api(prompt, semantic_key=(LEARNING_PATH_CACHE_NAMESPACE, ', '.join(skills_list))):
+            output += chunk
+            yield gr.update(visible=True, value=output)
 
         progress(1.0, desc="Generation complete!")
-        yield gr.update(visible=True, value=output if recommendations else "No specific recommendations found.")
+        yield gr.update(visible=True, value=output if output != header else "No specific recommendations found.")
     except Exception as e:
         logging.error(f"Error generating learning path: {e}")
         yield gr.update(visible=True, value=f"Error generating learning path: {e}")
 
-def generate_interview_questions(job_description, progress=gr.Progress(track_tqdm=True)):
+async def generate_interview_questions(job_description, progress=gr.Progress(track_tqdm=True)):
     progress(0, desc="Starting interview questions generation...")
     try:
         job_description = validate_input(job_description, "Job Description")
         yield gr.update(visible=True, value="### Generating Interview Questions...")
-        time.sleep(1)  # Simulate processing
         progress(0.5, desc="Querying questions...")
-        prompt = f"""
-        Based on the following job description, generate 3 relevant interview questions for the role.
-        Return a JSON object with a list of questions.
-        Job Description: {job_description}
-        """
-        response = call_gemini_api(prompt)
-        result = safe_parse_json(response.text)
-        questions = result.get('questions', [])
-
-        output = "### Interview Questions\n"
-        for i, question in enumerate(questions, 1):
-            output += f"{i}. {question}\n"
+        prompt = INTERVIEW_PROMPT_TMPL.format(job_description=job_description)
+        header = "### Interview Questions\n"
+        output = header
+        async for chunk in stream_gemini_api(prompt, semantic_key=(INTERVIEW_CACHE_NAMESPACE, job_description)):
+            output += chunk
+            yield gr.update(visible=True, value=output)
 
         progress(1.0, desc="Generation complete!")
-        yield gr.update(visible=True, value=output if questions else "No questions generated.")
+        yield gr.update(visible=True, value=output if output != header else "No questions generated.")
     except Exception as e:
         logging.error(f"Error generating interview questions: {e}")
         yield gr.update(visible=True, value=f"Error generating interview questions: {e}")
@@ -370,7 +636,7 @@ with gr.Blocks(theme=aurora_theme, css=custom_css, elem_classes="aurora-gradio-c
                     gr.Markdown("## Benchmark Your Skills\nUpload your CV and provide a job title or description to analyze your technical and soft skills.")
                     with gr.Row():
                         with gr.Column(scale=1):
-                            cv_input = gr.File(label="1. Upload Your CV (PDF only)")
+                            cv_input = gr.File(label="1. Upload Your CV (PDF only)", file_types=[".pdf"], type="binary")
                             job_description_input = gr.Textbox(label="2. Enter Your Job Description", placeholder="e.g., Data Analyst, Software Engineer, or paste a job description")
                             analyze_button = gr.Button("Analyze Now", variant="primary")
                         with gr.Column(scale=2):